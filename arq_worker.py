@@ -5,7 +5,7 @@ import logging.config
 from arq import Worker, func
 from arq.worker import get_kwargs
 from pydest.pydest import Pydest
-from seraphsix.constants import ARQ_JOB_TIMEOUT, ARQ_MAX_JOBS
+from seraphsix.constants import ARQ_JOB_TIMEOUT, ARQ_MAX_JOBS, REDIS_MIN_CONNECTIONS, REDIS_MAX_CONNECTIONS
 from seraphsix.database import Database
 from seraphsix.models import deserializer, serializer
 from seraphsix.tasks.activity import (
@@ -28,8 +28,12 @@ async def startup(ctx):
     database = Database(config.database_url, config.database_conns)
     await database.initialize()
     ctx['database'] = database
-    ctx['redis_cache'] = await aioredis.create_redis_pool(config.redis_url)
+    ctx['redis_cache'] = await aioredis.create_redis_pool(
+        config.redis_url, minsize=REDIS_MIN_CONNECTIONS, maxsize=REDIS_MAX_CONNECTIONS
+    )
     ctx['redis_jobs'] = ctx['redis']
+    ctx['manifest_state'] = {}
+    ctx['member_cache'] = {}
 
 
 async def shutdown(ctx):
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 import logging
 import logging.config
-import pickle
+import msgpack
 import redis
 import requests
 
@@ -52,9 +52,9 @@ def index():
         refresh_token=session.get('refresh_token')
     )
 
-    pickled_info = pickle.dumps(user_info)
+    packed_info = msgpack.packb(user_info)
     try:
-        red.publish(session['state'], pickled_info)
+        red.publish(session['state'], packed_info)
     except Exception:
         log.exception(f'/: Failed to publish state info to redis: {user_info} {session}')
         return render_template('message.html', message='Something went wrong.')
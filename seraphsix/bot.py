@@ -76,9 +76,12 @@ class SeraphSix(commands.Bot):
             'twitter': self.twitter,
             'the100': self.the100,
             'redis_cache': None,
-            'redis_jobs': None
+            'redis_jobs': None,
+            'manifest_state': {}
         }
 
+        self.sherpa_role_ids = {}
+
         for extension in STARTUP_EXTENSIONS:
             try:
                 self.load_extension(extension)
@@ -150,7 +153,11 @@ class SeraphSix(commands.Bot):
                 self.loop.create_task(self.process_tweet(tweet))
 
     async def connect_redis(self):
-        self.redis = await aioredis.create_redis_pool(self.config.redis_url)
+        self.redis = await aioredis.create_redis_pool(
+            self.config.redis_url,
+            minsize=constants.REDIS_MIN_CONNECTIONS,
+            maxsize=constants.REDIS_MAX_CONNECTIONS
+        )
         self.ext_conns['redis_cache'] = self.redis
         self.ext_conns['redis_jobs'] = await create_redis_jobs_pool()
 
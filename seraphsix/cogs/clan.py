@@ -22,7 +22,9 @@ from seraphsix.models.destiny import (
     DestinySearchPlayerResponse
 )
 from seraphsix.tasks.activity import get_game_counts, get_last_active
-from seraphsix.tasks.core import execute_pydest, get_primary_membership, execute_pydest_auth, get_memberships
+from seraphsix.tasks.core import (
+    execute_pydest, get_primary_membership, execute_pydest_auth, get_memberships, set_cached_members
+)
 from seraphsix.tasks.clan import info_sync, member_sync
 
 log = logging.getLogger(__name__)
@@ -739,13 +741,23 @@ Examples:
 
         admin_channel = self.bot.get_channel(self.bot.guild_map[ctx.guild.id].admin_channel)
 
+        keys = []
         cursor = b'0'
         while cursor:
-            cursor, keys = await redis_cache.scan(cursor, match=f'{ctx.guild.id}-clan-application-*')
+            cursor, found_keys = await redis_cache.scan(cursor, match=f'{ctx.guild.id}-clan-application-*')
+            keys.extend(found_keys)
+
+        # SCAN may return a key more than once across pages
+        keys = list(dict.fromkeys(keys))
 
         if len(keys) > 0:
+            # Fetch all applications in one round trip rather than one GET per key
+            pipe = redis_cache.pipeline()
             for key in keys:
-                embed_packed = await redis_cache.get(key)
+                pipe.get(key)
+            embeds_packed = await pipe.execute()
+
+            for key, embed_packed in zip(keys, embeds_packed):
                 member_db_id = key.decode('utf-8').split('-')[-1]
                 application_db = await ClanMemberApplication.filter(
                     member_id=member_db_id
@@ -896,6 +908,7 @@ Examples:
         )
 
         await member_db.delete()  # TODO
+        await set_cached_members(self.bot.ext_conns, ctx.guild.id, ctx.guild.name)
 
         return await manager.send_message(
             f"Member **{username}** has been kicked from {admin_db.clan.name}")
@@ -1001,7 +1014,7 @@ Examples:
             announcements.append(announcement)
 
         if announcements:
-            # await set_cached_members(self.bot.ext_conns, ctx.guild.id, ctx.guild.name)
+            await set_cached_members(self.bot.ext_conns, ctx.guild.id, ctx.guild.name)
 
             announcement_channel = ctx.guild.get_channel(self.bot.guild_map[ctx.guild.id].announcement_channel)
             if announcement_channel:
@@ -9,7 +9,7 @@ from seraphsix.cogs.utils.message_manager import MessageManager
 from seraphsix.models.database import TwitterChannel, Clan, Guild, Role
 from seraphsix.models.destiny import DestinyGroupResponse
 from seraphsix.tasks.core import execute_pydest
-from seraphsix.tasks.discord import store_sherpas
+from seraphsix.tasks.discord import get_sherpa_role_ids, store_sherpas
 
 log = logging.getLogger(__name__)
 
@@ -270,6 +270,7 @@ class ServerCog(commands.Cog, name="Server"):
 
         if roles:
             await Role.bulk_create(roles)
+            await get_sherpa_role_ids(self.bot, ctx.guild.id, refresh=True)
 
         return await manager.send_and_clean("Sherpa roles have been set")
 
@@ -459,6 +460,8 @@ class ServerCog(commands.Cog, name="Server"):
             return await manager.send_and_clean("Canceling command")
 
         await Role.filter(guild=guild_db).delete()
+        # This also removes the sherpa roles, so drop them from the cache
+        self.bot.sherpa_role_ids.pop(ctx.guild.id, None)
         return await manager.send_and_clean("Platform roles cleared")
 
     @role_set.command(name='protectedmember')
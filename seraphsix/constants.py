@@ -11,9 +11,20 @@ ROOT_LOG_LEVEL = 'INFO'
 
 LOG_FORMAT_MSG = '%(asctime)s %(name)s[%(process)d]: %(levelname)s %(message)s'
 DB_MAX_CONNECTIONS = 20
+DB_QUERY_CHUNK_SIZE = 500
+REDIS_MIN_CONNECTIONS = 5
+REDIS_MAX_CONNECTIONS = 20
 
 ARQ_MAX_JOBS = 100
 ARQ_JOB_TIMEOUT = TIME_HOUR_SECONDS
+MEMBER_CACHE_SECONDS = TIME_MIN_SECONDS * 5
+PROFILE_CACHE_SECONDS = TIME_MIN_SECONDS * 2
+
+DESTINY_API_MAX_CONCURRENCY = 20
+MANIFEST_UPDATE_SECONDS = TIME_HOUR_SECONDS * 24
+
+BACKOFF_MAX_TRIES = 10
+BACKOFF_MAX_WAIT = 30
 
 BLUE = discord.Color(3381759)
 CLEANUP_DELAY = 4
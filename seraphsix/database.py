@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 from datetime import timedelta
@@ -180,11 +179,29 @@ class Database(object):
         data = dict(clan_id=clan_id, game=game_db)
         _, is_created = await ClanGame.get_or_create(**data)
         if is_created:
-            tasks = [
-                self.create_game_member(player, game_db, clan_id)
-                for player in game.clan_players
-            ]
-            await asyncio.gather(*tasks)
+            await self.create_game_members(game_db, game)
+
+    async def create_game_members(self, game_db, game):
+        game_members = {}
+        for player in game.clan_players:
+            player_db = game.member_dbs[member_hash(player)].member
+            game_member_db = game_members.get(player_db.id)
+            if not game_member_db:
+                game_members[player_db.id] = GameMember(
+                    member=player_db,
+                    game=game_db,
+                    completed=player.completed,
+                    time_played=player.time_played
+                )
+            else:
+                # A player with more than one entry dropped and re-joined, so
+                # add up the time played and take the latest completion flag
+                game_member_db.time_played += player.time_played
+                game_member_db.completed = player.completed
+
+        await GameMember.bulk_create(list(game_members.values()))
+        player_hashes = [member_hash(player) for player in game.clan_players]
+        log.info(f"Players {player_hashes} created in game id {game_db.instance_id}")
 
     async def create_game_member(self, player, game_db, clan_id, player_db=None):
         if not player_db:
@@ -4,8 +4,11 @@ import msgpack
 from datetime import datetime
 
 from seraphsix import constants
+from seraphsix.models import destiny
 from seraphsix.models.destiny import *
 
+DESTINY_DATACLASSES = {name: getattr(destiny, name) for name in destiny.__all__}
+
 
 def encode_data(obj):
     if isinstance(obj, datetime):
@@ -24,7 +27,7 @@ def decode_data(obj):
     if '__datetime__' in obj:
         obj = datetime.strptime(obj['as_str'], constants.DESTINY_DATE_FORMAT)
     elif '__destiny_dataclass__' in obj:
-        obj = eval(obj['__destiny_dataclass__']).from_dict(obj['as_str'])
+        obj = DESTINY_DATACLASSES[obj['__destiny_dataclass__']].from_dict(obj['as_str'])
     return obj
 
 
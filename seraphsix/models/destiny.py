@@ -885,27 +885,28 @@ class ClanGame(Game):
         super().__init__(details)
         self.set_players(details)
 
-        members = {}
+        # Index the clan members by platform hash so players can be resolved without a query
+        self.member_dbs = {}
         for member_db in member_dbs:
             member = member_db.member
             if member.psn_id:
-                members.update(
+                self.member_dbs.update(
                     {member_hash_db(member, constants.PLATFORM_PSN): member_db}
                 )
             if member.xbox_id:
-                members.update(
+                self.member_dbs.update(
                     {member_hash_db(member, constants.PLATFORM_XBOX): member_db}
                 )
             if member.blizzard_id:
-                members.update(
+                self.member_dbs.update(
                     {member_hash_db(member, constants.PLATFORM_BLIZZARD): member_db}
                 )
             if member.steam_id:
-                members.update(
+                self.member_dbs.update(
                     {member_hash_db(member, constants.PLATFORM_STEAM): member_db}
                 )
             if member.stadia_id:
-                members.update(
+                self.member_dbs.update(
                     {member_hash_db(member, constants.PLATFORM_STADIA): member_db}
                 )
 
@@ -914,5 +915,5 @@ class ClanGame(Game):
         self.clan_players = []
         for player in self.players:
             player_hash = member_hash(player)
-            if player_hash in members.keys() and self.date > members[player_hash].join_date:
+            if player_hash in self.member_dbs and self.date > self.member_dbs[player_hash].join_date:
                 self.clan_players.append(player)
@@ -1,25 +1,32 @@
 import asyncio
+import backoff
 import itertools
 import logging
+import time
 
 from tortoise.functions import Max, Count
 from tortoise.exceptions import DoesNotExist
 from tortoise.expressions import Subquery
+from tortoise.transactions import in_transaction
 from typing import Tuple
 
 from seraphsix import constants
 from seraphsix.errors import PrivateHistoryError
+from seraphsix.models import deserializer, serializer
 from seraphsix.models.database import ClanMember, Game, GameMember, Member
 from seraphsix.models.destiny import (
     Game as GameApi, ClanGame, DestinyProfileResponse, DestinyActivityResponse, DestinyPGCRResponse
 )
 from seraphsix.tasks.core import execute_pydest, get_cached_members, get_primary_membership
-from seraphsix.tasks.parsing import member_hash, member_hash_db
+from seraphsix.tasks.parsing import member_hash
 
 
 log = logging.getLogger(__name__)
 
+SUPPORTED_MODE_IDS = frozenset(itertools.chain.from_iterable(constants.SUPPORTED_GAME_MODES.values()))
 
+
+@backoff.on_exception(backoff.expo, RuntimeError, max_tries=2, jitter=backoff.full_jitter, logger=None)
 async def get_activity_history(ctx, platform_id, member_id, char_id, count=250, full_sync=False, mode=0):
     destiny = ctx['destiny']
 
@@ -56,6 +63,7 @@ async def get_activity_history(ctx, platform_id, member_id, char_id, count=250,
     return activities
 
 
+@backoff.on_exception(backoff.expo, RuntimeError, max_tries=2, jitter=backoff.full_jitter, logger=None)
 async def get_pgcr(ctx, activity_id):
     destiny = ctx['destiny']
     data = await execute_pydest(
@@ -65,7 +73,13 @@ async def get_pgcr(ctx, activity_id):
 
 async def decode_activity(ctx, reference_id, definition):
     destiny = ctx['destiny']
-    await execute_pydest(destiny.update_manifest, return_type=None)
+    # Only refresh the manifest periodically, otherwise every decode becomes a manifest download
+    # manifest_state is created at startup since arq hands each job a copy of the worker context
+    manifest_state = ctx['manifest_state']
+    manifest_updated = manifest_state.get('updated')
+    if not manifest_updated or time.monotonic() - manifest_updated > constants.MANIFEST_UPDATE_SECONDS:
+        await execute_pydest(destiny.update_manifest, return_type=None)
+        manifest_state['updated'] = time.monotonic()
     return await execute_pydest(destiny.decode_hash, reference_id, definition, return_type=None)
 
 
@@ -84,15 +98,30 @@ async def get_activity_list(ctx, platform_id, member_id, characters, count, full
     return all_activities
 
 
-async def get_last_active(ctx, member_db=None, platform_id=None, member_id=None):
-    acct_last_active = None
-    if member_db and not platform_id and not member_id:
-        platform_id, member_id, _ = get_primary_membership(member_db)
+async def get_profile(ctx, platform_id, member_id):
+    """Get a member's profile, cached briefly so the last active and activity sweeps share one API call"""
+    redis_cache = ctx['redis_cache']
+    cache_key = f'{platform_id}-{member_id}-profile'
+
+    profile = await redis_cache.get(cache_key)
+    if profile:
+        return deserializer(profile)
 
     profile = await execute_pydest(
         ctx['destiny'].api.get_profile, platform_id, member_id, [constants.COMPONENT_PROFILES],
         return_type=DestinyProfileResponse
     )
+    if profile.response:
+        await redis_cache.set(cache_key, serializer(profile), expire=constants.PROFILE_CACHE_SECONDS)
+    return profile
+
+
+async def get_last_active(ctx, member_db=None, platform_id=None, member_id=None):
+    acct_last_active = None
+    if member_db and not platform_id and not member_id:
+        platform_id, member_id, _ = get_primary_membership(member_db)
+
+    profile = await get_profile(ctx, platform_id, member_id)
     if not profile.response:
         log.error(f"Could not get character data for {platform_id}-{member_id}: {profile.message}")
     else:
@@ -119,7 +148,7 @@ async def store_last_active(ctx, guild_id, guild_name):
 
 async def get_game_counts(database, game_mode, member_db=None):
     base_query = Game.annotate(count=Count('id'))
-    modes = [mode_id for mode_id in constants.SUPPORTED_GAME_MODES.get(game_mode)]
+    modes = constants.SUPPORTED_GAME_MODES.get(game_mode)
 
     if member_db:
         query = base_query.filter(
@@ -130,10 +159,11 @@ async def get_game_counts(database, game_mode, member_db=None):
     else:
         query = base_query.filter(mode_id__in=modes)
 
+    # Several mode ids share a title (e.g. all nightfall variants), so sum them per title
     counts = {}
     for row in await query.group_by('mode_id').values('mode_id', 'count'):
         game_title = constants.MODE_MAP[row['mode_id']]['title']
-        counts[game_title] = row['count']
+        counts[game_title] = counts.get(game_title, 0) + row['count']
     return counts
 
 
@@ -143,11 +173,8 @@ async def get_sherpa_time_played(member_db: object) -> Tuple[int, list]:
         is_sherpa=True, id__not=member_db.id
     ).only('member_id')
 
-    full_list = list(constants.SUPPORTED_GAME_MODES.values())
-    mode_list = list(set([mode for sublist in full_list for mode in sublist]))
-
     all_games = GameMember.filter(
-        game__mode_id__in=mode_list, member=member_db.member, time_played__not_isnull=True
+        game__mode_id__in=SUPPORTED_MODE_IDS, member=member_db.member, time_played__not_isnull=True
     ).only('game_id')
 
     sherpa_games = GameMember.filter(
@@ -177,13 +204,11 @@ async def get_sherpa_time_played(member_db: object) -> Tuple[int, list]:
         'game_id'
     ).values('game_id', 'sherpa_time')
 
-    total_time = 0
-    for result in query:
-        total_time += result['sherpa_time']
+    total_time = sum(result['sherpa_time'] for result in query)
 
     # https://github.com/tortoise/tortoise-orm/issues/780
     all_games = GameMember.filter(
-        game__mode_id__in=mode_list, member=member_db.member, time_played__not_isnull=True
+        game__mode_id__in=SUPPORTED_MODE_IDS, member=member_db.member, time_played__not_isnull=True
     ).only('game_id')
 
     sherpa_games = GameMember.filter(
@@ -197,6 +222,22 @@ async def get_sherpa_time_played(member_db: object) -> Tuple[int, list]:
     return (total_time, sherpa_ids)
 
 
+async def filter_stored_activities(activities):
+    """Remove activities whose games have already been stored, so their PGCRs aren't fetched again"""
+    if not activities:
+        return []
+
+    # Query in chunks to keep the IN clauses a reasonable size, the chunks can then run concurrently
+    activity_ids = [activity.activity_details.instance_id for activity in activities]
+    chunk_size = constants.DB_QUERY_CHUNK_SIZE
+    tasks = [
+        Game.filter(instance_id__in=activity_ids[i:i + chunk_size]).values_list('instance_id', flat=True)
+        for i in range(0, len(activity_ids), chunk_size)
+    ]
+    stored_ids = set(itertools.chain.from_iterable(await asyncio.gather(*tasks)))
+    return [activity for activity in activities if activity.activity_details.instance_id not in stored_ids]
+
+
 async def store_all_games(ctx, guild_id, guild_name, count=30, recent=True):
     database = ctx['database']
     redis_jobs = ctx['redis_jobs']
@@ -207,48 +248,45 @@ async def store_all_games(ctx, guild_id, guild_name, count=30, recent=True):
         log.info(f"No clans found for {guild_name} ({guild_id})")
         return
 
-    tasks = []
+    tracked_clan_dbs = []
+    for clan_db in clan_dbs:
+        if not clan_db.activity_tracking:
+            log.info(f"Clan activity tracking disabled for Clan {clan_db.name}, skipping")
+            continue
+        tracked_clan_dbs.append(clan_db)
+
     if recent:
         log.info(f"Finding all games for members of {guild_name} ({guild_id}) active in the last hour")
-
-        for clan_db in clan_dbs:
-            if not clan_db.activity_tracking:
-                log.info(f"Clan activity tracking disabled for Clan {clan_db.name}, skipping")
-                continue
-
-            tasks.extend([
-                get_member_activity(ctx, clanmember.member, count=count, full_sync=False)
-                for clanmember in await database.get_clan_members_active(clan_db, hours=1)
-            ])
+        member_tasks = [database.get_clan_members_active(clan_db, hours=1) for clan_db in tracked_clan_dbs]
     else:
-        for clan_db in clan_dbs:
-            if not clan_db.activity_tracking:
-                log.info(f"Clan activity tracking disabled for Clan {clan_db.name}, skipping")
-                continue
+        member_tasks = [database.get_clan_members([clan_db.clan_id]) for clan_db in tracked_clan_dbs]
 
-            tasks.extend([
-                get_member_activity(ctx, clanmember.member, count=count, full_sync=False)
-                for clanmember in await database.get_clan_members([clan_db.clan_id])
-            ])
+    clan_members = itertools.chain.from_iterable(await asyncio.gather(*member_tasks))
 
+    tasks = [
+        get_member_activity(ctx, clanmember.member, count=count, full_sync=False)
+        for clanmember in clan_members
+    ]
     results = await asyncio.gather(*tasks)
 
     # Create a list of unique activities by first joining the gather results,
     # then iterate that list for unique instance id's
-    all_activities = list(itertools.chain.from_iterable(results))
+    all_activities = list(itertools.chain.from_iterable(result for result in results if result))
     all_activities_dict = {}
     for activity in all_activities:
         key = activity.activity_details.instance_id
         if key not in all_activities_dict:
             all_activities_dict[key] = activity
-    unique_activities = list(all_activities_dict.values())
+    unique_activities = await filter_stored_activities(list(all_activities_dict.values()))
 
-    tasks = []
-    for activity in unique_activities:
-        activity_id = activity.activity_details.instance_id
-        await redis_jobs.enqueue_job(
-            'process_activity', activity, guild_id, guild_name, _job_id=f'process_activity-{activity_id}'
+    tasks = [
+        redis_jobs.enqueue_job(
+            'process_activity', activity, guild_id, guild_name,
+            _job_id=f'process_activity-{activity.activity_details.instance_id}'
         )
+        for activity in unique_activities
+    ]
+    await asyncio.gather(*tasks)
 
     log.info(
         f"Processed {len(unique_activities)} games for members of {guild_name} ({guild_id}) active in the last hour"
@@ -265,12 +303,8 @@ async def get_member_activity(ctx, member_db, count=250, full_sync=False, mode=0
 
 
 async def get_characters(ctx, member_id, platform_id):
-    destiny = ctx['destiny']
     retval = None
-    profile = await execute_pydest(
-        destiny.api.get_profile, platform_id, member_id, [constants.COMPONENT_PROFILES],
-        return_type=DestinyProfileResponse
-    )
+    profile = await get_profile(ctx, platform_id, member_id)
     if profile.response:
         retval = profile.response.profile.data.character_ids
     return retval
@@ -279,21 +313,26 @@ async def get_characters(ctx, member_id, platform_id):
 async def process_activity(ctx, activity, guild_id, guild_name, player_check=False):
     database = ctx['database']
     game = GameApi(activity)
-    member_dbs = await get_cached_members(ctx, guild_id, guild_name)
 
-    clan_dbs = await database.get_clans_by_guild(guild_id)
-    clan_ids = [clan.id for clan in clan_dbs]
+    if game.mode_id not in SUPPORTED_MODE_IDS:
+        log.debug(f'Continuing because game {game.instance_id} mode {game.mode_id} not supported')
+        return
 
+    # Check for an existing game before loading members or fetching the PGCR,
+    # since there is nothing else to do for a stored game unless checking players
     game_db = await Game.get_or_none(instance_id=game.instance_id)
-    if not game_db:
+    if game_db and not player_check:
+        log.debug(f"Continuing because game {game.instance_id} exists")
+        return
+
+    member_dbs = await get_cached_members(ctx, guild_id, guild_name)
+
+    if not game_db and player_check:
         log.debug(f"Skipping missing player check because game {game.instance_id} does not exist")
-    elif player_check:
+    elif game_db:
         pgcr = await get_pgcr(ctx, game.instance_id)
         clan_game = ClanGame(pgcr, member_dbs)
-        api_players_db = [
-            await database.get_clan_member_by_platform(player.membership_id, player.membership_type, clan_ids)
-            for player in clan_game.clan_players
-        ]
+        api_players_db = [clan_game.member_dbs[member_hash(player)] for player in clan_game.clan_players]
 
         db_players_db = await ClanMember.filter(
             member__games__game__instance_id=game.instance_id
@@ -307,21 +346,16 @@ async def process_activity(ctx, activity, guild_id, guild_name, player_check=Fal
             raise
 
         if len(missing_player_dbs) > 0:
-            for missing_player_db in missing_player_dbs:
-                member_db = missing_player_db.member
-                for game_player in clan_game.clan_players:
-                    if member_hash(game_player) == member_hash_db(member_db, game_player.membership_type) \
-                            and game.date > missing_player_db.join_date:
-                        log.debug(f'Found missing player in {game.instance_id} {game_player}')
-                        await database.create_game_member(
-                            game_player, game_db, member_dbs[0].clan_id, member_db)
+            # Clan players were already matched to their clan member (and join date) by ClanGame,
+            # so reuse that index rather than re-hashing every missing member against every player
+            for game_player in clan_game.clan_players:
+                player_db = clan_game.member_dbs[member_hash(game_player)]
+                if player_db in missing_player_dbs:
+                    log.debug(f'Found missing player in {game.instance_id} {game_player}')
+                    await database.create_game_member(
+                        game_player, game_db, member_dbs[0].clan_id, player_db.member)
         else:
-            log.debug(f"Continuing because game {game.instance_id} exists")
-        return
-
-    supported_modes = set(sum(constants.SUPPORTED_GAME_MODES.values(), []))
-    if game.mode_id not in supported_modes:
-        log.debug(f'Continuing because game {game.instance_id} mode {game.mode_id} not supported')
+            log.debug(f"Continuing because game {game.instance_id} has no missing players")
         return
 
     pgcr = await get_pgcr(ctx, game.instance_id)
@@ -335,12 +369,14 @@ async def process_activity(ctx, activity, guild_id, guild_name, player_check=Fal
         log.debug(f"Continuing because not enough clan players in game {game.instance_id}")
         return
 
-    game_db = await database.create_game(clan_game)
-    if not game_db:
-        log.error(f"Continuing because error with storing game {game.instance_id}")
-        return
+    async with in_transaction():
+        game_db = await database.create_game(clan_game)
+        if not game_db:
+            log.error(f"Continuing because error with storing game {game.instance_id}")
+            return
+
+        await database.create_clan_game(game_db, clan_game, clan_game.clan_id)
 
-    await database.create_clan_game(game_db, clan_game, clan_game.clan_id)
     game_title = game_mode_details['title'].title()
     log.info(f"{game_title} game id {game.instance_id} on {game.date} created")
 
@@ -349,10 +385,16 @@ async def store_member_history(ctx, member_db_id, guild_id, guild_name, full_syn
     redis_jobs = ctx['redis_jobs']
 
     member_db = await Member.get(id=member_db_id)
-    activities = await get_member_activity(ctx, member_db, count, full_sync, mode)
+    activities = await filter_stored_activities(await get_member_activity(ctx, member_db, count, full_sync, mode))
+    if not activities:
+        return
 
-    for activity in activities:
-        activity_id = activity.activity_details.instance_id
-        await redis_jobs.enqueue_job(
-            'process_activity', activity, guild_id, guild_name, _job_id=f'process_activity-{activity_id}'
+    # Queue all activities at once so the workers can fetch the PGCRs concurrently
+    tasks = [
+        redis_jobs.enqueue_job(
+            'process_activity', activity, guild_id, guild_name,
+            _job_id=f'process_activity-{activity.activity_details.instance_id}'
         )
+        for activity in activities
+    ]
+    await asyncio.gather(*tasks)
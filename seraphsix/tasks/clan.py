@@ -8,7 +8,7 @@ from seraphsix.models.database import Member as MemberDb, ClanMember, Clan, Clan
 from seraphsix.models.destiny import (
     Member, DestinyGroupMembersResponse, DestinyMembershipResponse, DestinyGroupResponse
 )
-from seraphsix.tasks.core import execute_pydest, execute_pydest_auth, get_primary_membership
+from seraphsix.tasks.core import execute_pydest, execute_pydest_auth, get_primary_membership, set_cached_members
 
 log = logging.getLogger(__name__)
 
@@ -39,11 +39,15 @@ async def get_all_members(destiny, group_id):
     group = await execute_pydest(
         destiny.api.get_members_of_group, group_id, return_type=DestinyGroupMembersResponse)
     group_members = group.response.results
-    for member in group_members:
-        profile = await execute_pydest(
+    tasks = [
+        execute_pydest(
             destiny.api.get_membership_data_by_id, member.destiny_user_info.membership_id,
             return_type=DestinyMembershipResponse
         )
+        for member in group_members
+    ]
+    profiles = await asyncio.gather(*tasks)
+    for member, profile in zip(group_members, profiles):
         yield Member(member, profile.response)
 
 
@@ -145,8 +149,8 @@ async def member_sync(ctx, guild_id, guild_name):
         member_changes[clan_db.clan_id]['removed'].append(member_hash)
 
     # Ensure we bust the member cache before queueing jobs
-    # TODO: Until Tortoise has deserialization support, this has to stay disabled
-    # await set_cached_members(ctx, guild_id, guild_name)
+    if members_added or members_removed:
+        await set_cached_members(ctx, guild_id, guild_name)
 
     for clan_id, changes in member_changes.items():
         if len(changes['added']):
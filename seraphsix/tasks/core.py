@@ -3,8 +3,9 @@ import asyncio
 import backoff
 import discord
 import logging
-import pickle
+import msgpack
 import pydest
+import time
 
 from aiohttp.client_exceptions import ServerDisconnectedError, ClientOSError
 from pydest.pydest import PydestException
@@ -18,6 +19,7 @@ from seraphsix.errors import MaintenanceError, PrivateHistoryError, InvalidComma
 
 log = logging.getLogger(__name__)
 config = Config()
+destiny_api_semaphore = None
 
 
 async def create_redis_jobs_pool():
@@ -33,8 +35,17 @@ async def queue_redis_job(ctx, message, *args, **kwargs):
     await ctx['redis_jobs'].enqueue_job(*args, **kwargs)
 
 
+def get_destiny_api_semaphore():
+    """Get the semaphore shared by every Destiny API call in this process"""
+    # Created on first use so it binds to the running event loop, not the one at import time
+    global destiny_api_semaphore
+    if destiny_api_semaphore is None:
+        destiny_api_semaphore = asyncio.Semaphore(constants.DESTINY_API_MAX_CONCURRENCY)
+    return destiny_api_semaphore
+
+
 def backoff_handler(details):
-    if details['wait'] > 30 or details['tries'] > 10:
+    if details['wait'] > constants.BACKOFF_MAX_WAIT / 2 or details['tries'] > constants.BACKOFF_MAX_TRIES / 2:
         log.debug(
             f"Backing off {details['wait']:0.1f} seconds after {details['tries']} tries "
             f"for {details['target']} args {details['args']} kwargs {details['kwargs']}"
@@ -45,22 +56,23 @@ def backoff_handler(details):
 @backoff.on_exception(
     backoff.expo,
     (PydestException, asyncio.TimeoutError, BucketFullException, ServerDisconnectedError, ClientOSError),
-    logger=None, on_backoff=backoff_handler
+    base=2, factor=1, max_value=constants.BACKOFF_MAX_WAIT, max_tries=constants.BACKOFF_MAX_TRIES,
+    jitter=backoff.full_jitter, logger=None, on_backoff=backoff_handler
 )
 async def execute_pydest(function, *args, **kwargs):
     retval = None
 
-    if 'return_type' in kwargs:
-        return_type = kwargs.pop('return_type')
-    else:
-        return_type = DestinyResponse
+    return_type = kwargs.pop('return_type', DestinyResponse)
 
     log.debug(f"{function} {args} {kwargs}")
 
-    async with config.destiny_api_limiter.ratelimit('destiny_api', delay=True):
+    # The semaphore caps in-flight requests across every fan-out in this process,
+    # the limiter then shapes the request rate across all processes
+    async with get_destiny_api_semaphore(), config.destiny_api_limiter.ratelimit('destiny_api', delay=True):
         data = await function(*args, **kwargs)
 
-    log.debug(f"{function} {args} {kwargs} - {data}")
+    # Full API responses (e.g. PGCRs) are large, so leave formatting them to the logger
+    log.debug("%s %s %s - %s", function, args, kwargs, data)
 
     # None is a valid value for return_type, in this case we don't try and turn it into
     # a dataclass. This is primarily used for manifest decoding.
@@ -98,7 +110,7 @@ async def execute_pydest(function, *args, **kwargs):
                 if res.error_status not in ['DestinyAccountNotFound', 'ClanMaximumMembershipReached']:
                     raise PydestException
     retval = res
-    log.debug(f"{function} {args} {kwargs} - {res}")
+    log.debug("%s %s %s - %s", function, args, kwargs, res)
     return retval
 
 
@@ -188,8 +200,8 @@ async def register(manager, extra_message='', confirm_message=''):
 async def wait_for_msg(channel):
     """Wait for a message on the specified Redis channel"""
     while (await channel.wait_message()):
-        pickled_msg = await channel.get()
-        return pickle.loads(pickled_msg)
+        packed_msg = await channel.get()
+        return msgpack.unpackb(packed_msg)
 
 
 # def member_dbs_to_dict(member_dbs):
@@ -202,7 +214,27 @@ async def wait_for_msg(channel):
 
 
 async def get_cached_members(ctx, guild_id, guild_name):
-    return await ctx['database'].get_clan_members_by_guild_id(guild_id)
+    # Tortoise models can't be cached in Redis yet (see below), so keep the guild's members in the
+    # worker's member_cache for a short while instead of loading them again for every activity job.
+    # It is created at startup since arq hands each job a copy of the worker context, and the
+    # query task itself is cached so concurrent jobs share a single load. Entries are tagged with
+    # the guild's roster version, which set_cached_members bumps whenever the roster changes.
+    version = await ctx['redis_cache'].get(f'{guild_id}-members-version')
+    member_cache = ctx['member_cache']
+    cached = member_cache.get(guild_id)
+    if not cached or cached[1] != version or time.monotonic() - cached[0] > constants.MEMBER_CACHE_SECONDS:
+        task = asyncio.ensure_future(ctx['database'].get_clan_members_by_guild_id(guild_id))
+        cached = member_cache[guild_id] = (time.monotonic(), version, task)
+
+    # Shielded so a cancelled job doesn't cancel the load for every other job waiting on it, and
+    # BaseException since CancelledError isn't an Exception, which would otherwise leave a dead entry
+    task = cached[2]
+    try:
+        return await asyncio.shield(task)
+    except BaseException:
+        if task.done() and (task.cancelled() or task.exception()) and member_cache.get(guild_id) is cached:
+            member_cache.pop(guild_id)
+        raise
     # TODO: Until Tortoise has deserialization support, this has to stay disabled
     # cache_key = f'{guild_id}-members'
     # clan_members = await ctx['redis_cache'].get(cache_key)
@@ -214,7 +246,9 @@ async def get_cached_members(ctx, guild_id, guild_name):
 
 
 async def set_cached_members(ctx, guild_id, guild_name):
-    return
+    # Bumping the roster version makes every worker reload the guild's members on next use
+    await ctx['redis_cache'].incr(f'{guild_id}-members-version')
+    log.info(f"Invalidated cached members of {guild_name} ({guild_id})")
     # TODO: Until Tortoise has deserialization support, this has to stay disabled
     # cache_key = f'{guild_id}-members'
     # redis_cache = ctx['redis_cache']
@@ -14,11 +14,19 @@ async def convert_sherpas(bot, sherpas):
         yield await bot.fetch_user(sherpa)
 
 
+async def get_sherpa_role_ids(bot, guild_id, refresh=False):
+    """Get the cached set of sherpa role ids for a guild, loading them from the database if needed"""
+    if refresh or guild_id not in bot.sherpa_role_ids:
+        roles_db = await Role.filter(guild__guild_id=guild_id, is_sherpa=True)
+        bot.sherpa_role_ids[guild_id] = set([role.role_id for role in roles_db])
+    return bot.sherpa_role_ids[guild_id]
+
+
 async def find_sherpas(bot, guild):
     sherpas = []
     guild_obj = bot.get_guild(guild.guild_id)
-    for role in await Role.filter(guild_id=guild.id, is_sherpa=True).all():
-        role_obj = discord.utils.get(guild_obj.roles, id=role.role_id)
+    for role_id in await get_sherpa_role_ids(bot, guild.guild_id, refresh=True):
+        role_obj = discord.utils.get(guild_obj.roles, id=role_id)
         sherpas.extend(role_obj.members)
     return sherpas
 
@@ -66,6 +74,12 @@ async def update_sherpa(bot, before, after):
     if before_role_ids == after_role_ids:
         return
 
+    # Only go to the database if the change gained or lost a sherpa role
+    sherpa_role_ids = await get_sherpa_role_ids(bot, after.guild.id)
+    member_is_sherpa = bool(after_role_ids.intersection(sherpa_role_ids))
+    if member_is_sherpa == bool(before_role_ids.intersection(sherpa_role_ids)):
+        return
+
     guild_db = await Guild.get(guild_id=after.guild.id)
     if not guild_db.track_sherpas:
         log.debug(
@@ -79,11 +93,6 @@ async def update_sherpa(bot, before, after):
         f"in {str(after.guild)} ({after.guild.id})"
     )
 
-    roles_db = await Role.filter(
-        guild__guild_id=after.guild.id, is_sherpa=True
-    )
-    role_db_ids = set([role.role_id for role in roles_db])
-
     member_db = await ClanMember.get_or_none(member__discord_id=after.id)
     if not member_db:
         log.info(
@@ -92,13 +101,6 @@ async def update_sherpa(bot, before, after):
         )
         return
 
-    if not after_role_ids:
-        member_is_sherpa = False
-    elif after_role_ids.intersection(role_db_ids):
-        member_is_sherpa = True
-    else:
-        member_is_sherpa = False
-
     if member_is_sherpa != member_db.is_sherpa:
         log.info(
             f"Sherpa role changed from {member_db.is_sherpa} to {member_is_sherpa} "
@@ -1,5 +1,14 @@
 from seraphsix import constants
 
+PLATFORM_FIELD_MAP = {
+    constants.PLATFORM_BUNGIE: ('bungie_id', 'bungie_username'),
+    constants.PLATFORM_PSN: ('psn_id', 'psn_username'),
+    constants.PLATFORM_XBOX: ('xbox_id', 'xbox_username'),
+    constants.PLATFORM_BLIZZARD: ('blizzard_id', 'blizzard_username'),
+    constants.PLATFORM_STEAM: ('steam_id', 'steam_username'),
+    constants.PLATFORM_STADIA: ('stadia_id', 'stadia_username'),
+}
+
 
 def member_hash(member):
     return f'{member.membership_type}-{member.membership_id}'
@@ -11,22 +20,5 @@ def member_hash_db(member_db, platform_id):
 
 
 def parse_platform(member_db, platform_id):
-    if platform_id == constants.PLATFORM_BUNGIE:
-        member_id = member_db.bungie_id
-        member_username = member_db.bungie_username
-    elif platform_id == constants.PLATFORM_PSN:
-        member_id = member_db.psn_id
-        member_username = member_db.psn_username
-    elif platform_id == constants.PLATFORM_XBOX:
-        member_id = member_db.xbox_id
-        member_username = member_db.xbox_username
-    elif platform_id == constants.PLATFORM_BLIZZARD:
-        member_id = member_db.blizzard_id
-        member_username = member_db.blizzard_username
-    elif platform_id == constants.PLATFORM_STEAM:
-        member_id = member_db.steam_id
-        member_username = member_db.steam_username
-    elif platform_id == constants.PLATFORM_STADIA:
-        member_id = member_db.stadia_id
-        member_username = member_db.stadia_username
-    return member_id, member_username
+    id_field, username_field = PLATFORM_FIELD_MAP[platform_id]
+    return getattr(member_db, id_field), getattr(member_db, username_field)